@@ -0,0 +1,7 @@
+# Point the app at a throw-away `.vaultsafe` directory before any `vaultsafe`
+# module is imported, so that the tests never touch a real vault.
+import os
+import tempfile
+
+os.environ['DEV_MODE'] = 'on'
+os.chdir(tempfile.mkdtemp(prefix='vaultsafe-tests-'))
@@ -0,0 +1,251 @@
+# Tests for the migration of vaults and exported files created by older versions.
+# Author: Indrajit Ghosh
+# Created On: Oct 14, 2026
+#
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from cryptography.fernet import Fernet
+
+from vaultsafe.db.models import Base, engine, session, Vault, Credential, Mnemonic
+from vaultsafe.utils.auth_utils import get_cached_vault_key
+from vaultsafe.utils.crypto_utils import (
+    derive_vault_key, derive_legacy_vault_key, generate_fernet_key, sha256_hash
+)
+from vaultsafe.commands.export import export_credentials
+from vaultsafe.commands.import_credentials import import_credentials_from_json
+from vaultsafe.config import DOT_VAULTSAFE_DIR, DOT_SESSION_FILE, DOT_VAULT_KEY_CACHE_FILE
+
+MASTER_PASSWD = 'correct horse battery staple'
+FILE_PASSWD = 'file password'
+
+CREDENTIAL_DATA = {
+    'username': 'alice',
+    'password': 's3cr3t!',
+    'url': 'https://example.com',
+    'notes': 'line one\nline two'
+}
+
+
+class VaultTestCase(unittest.TestCase):
+    """Provides a fresh, empty database for every test."""
+
+    def setUp(self):
+        DOT_VAULTSAFE_DIR.mkdir(parents=True, exist_ok=True)
+        session.rollback()
+        session.expunge_all()
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        for path in (DOT_SESSION_FILE, DOT_VAULT_KEY_CACHE_FILE):
+            if path.exists():
+                path.unlink()
+
+    def tearDown(self):
+        session.rollback()
+        session.expunge_all()
+
+    def create_legacy_vault(self, session_check=True):
+        """
+        Creates a vault as older versions did: a salted SHA-256 master password hash,
+        a PBKDF2 `vault_key` and a Fernet encrypted credential. Returns the credential.
+        """
+        legacy_vault_key = derive_legacy_vault_key(master_key=MASTER_PASSWD)
+
+        vault = Vault(
+            password_salt='legacy-salt',
+            master_password_hash=sha256_hash(MASTER_PASSWD + 'legacy-salt'),
+            vault_key_hash=sha256_hash(legacy_vault_key),
+            session_check=session_check
+        )
+
+        credential_key = generate_fernet_key()
+        fernet = Fernet(credential_key)
+        credential = Credential(
+            name='Legacy',
+            encrypted_key=Fernet(legacy_vault_key).encrypt(credential_key),
+            encryption_algorithm=Credential.LEGACY_ENCRYPTION_ALGO,
+            **{field: fernet.encrypt(value.encode()) for field, value in CREDENTIAL_DATA.items()}
+        )
+
+        session.add_all([vault, credential, Mnemonic(name='legacy', credential=credential)])
+        session.commit()
+        return credential
+
+    def assert_credential_data(self, credential, vault_key):
+        data = credential.json(vault_key=vault_key)
+        for field, value in CREDENTIAL_DATA.items():
+            self.assertEqual(data[field], value)
+        for field in set(Credential.ENCRYPTED_FIELDS) - set(CREDENTIAL_DATA):
+            self.assertEqual(data[field], Credential.NONE_STR)
+
+
+class TestLegacyVaultMigration(VaultTestCase):
+
+    def test_legacy_password_hash(self):
+        self.create_legacy_vault()
+        vault = session.query(Vault).first()
+
+        self.assertTrue(vault.check_password(MASTER_PASSWD))
+        self.assertFalse(vault.check_password('wrong password'))
+        self.assertTrue(vault.needs_password_rehash())
+
+    def test_legacy_password_hash_is_upgraded(self):
+        self.create_legacy_vault()
+        vault = session.query(Vault).first()
+
+        self.assertTrue(vault.upgrade_password_hash(MASTER_PASSWD))
+        session.commit()
+
+        session.expire_all()
+        vault = session.query(Vault).first()
+        self.assertTrue(vault.master_password_hash.startswith('$argon2id'))
+        self.assertFalse(vault.needs_password_rehash())
+        self.assertFalse(vault.upgrade_password_hash(MASTER_PASSWD))
+        self.assertTrue(vault.check_password(MASTER_PASSWD))
+        self.assertFalse(vault.check_password('wrong password'))
+
+    def test_legacy_vault_is_migrated_and_decrypts(self):
+        self.create_legacy_vault()
+
+        vault_key = get_cached_vault_key(master_passwd=MASTER_PASSWD)
+
+        session.expire_all()
+        vault = session.query(Vault).first()
+        credential = session.query(Credential).first()
+
+        self.assertEqual(vault_key, derive_vault_key(master_key=MASTER_PASSWD))
+        self.assertEqual(vault.vault_key_hash, sha256_hash(vault_key))
+        self.assertEqual(credential.encryption_algorithm, Credential.DEFAULT_ENCRYPTION_ALGO)
+        self.assert_credential_data(credential, vault_key)
+
+        # A second unlock reads the migrated vault (from the cache) and still decrypts
+        self.assertEqual(get_cached_vault_key(master_passwd=MASTER_PASSWD), vault_key)
+        self.assert_credential_data(session.query(Credential).first(), vault_key)
+
+    def test_legacy_vault_is_migrated_without_session_check(self):
+        self.create_legacy_vault(session_check=False)
+
+        vault_key = get_cached_vault_key(master_passwd=MASTER_PASSWD)
+
+        self.assertFalse(DOT_VAULT_KEY_CACHE_FILE.exists())
+        session.expire_all()
+        self.assert_credential_data(session.query(Credential).first(), vault_key)
+
+    def test_fernet_credentials_under_current_vault_key_are_migrated(self):
+        self.create_legacy_vault()
+        vault_key = get_cached_vault_key(master_passwd=MASTER_PASSWD)
+
+        # A credential still stored with Fernet, but under the current vault key
+        credential_key = generate_fernet_key()
+        fernet = Fernet(credential_key)
+        credential = Credential(
+            name='Fernet',
+            encrypted_key=Fernet(vault_key).encrypt(credential_key),
+            encryption_algorithm=Credential.LEGACY_ENCRYPTION_ALGO,
+            **{field: fernet.encrypt(value.encode()) for field, value in CREDENTIAL_DATA.items()}
+        )
+        session.add(credential)
+        session.commit()
+
+        self.assertEqual(get_cached_vault_key(master_passwd=MASTER_PASSWD), vault_key)
+
+        session.expire_all()
+        for credential in session.query(Credential).all():
+            self.assertEqual(credential.encryption_algorithm, Credential.DEFAULT_ENCRYPTION_ALGO)
+            self.assert_credential_data(credential, vault_key)
+
+    def test_wrong_master_password_does_not_migrate(self):
+        self.create_legacy_vault()
+
+        with self.assertRaises(SystemExit):
+            get_cached_vault_key(master_passwd='wrong password')
+
+        session.expire_all()
+        credential = session.query(Credential).first()
+        self.assertEqual(credential.encryption_algorithm, Credential.LEGACY_ENCRYPTION_ALGO)
+        self.assertFalse(DOT_VAULT_KEY_CACHE_FILE.exists())
+
+        # The untouched legacy vault still migrates with the right password
+        vault_key = get_cached_vault_key(master_passwd=MASTER_PASSWD)
+        session.expire_all()
+        self.assert_credential_data(session.query(Credential).first(), vault_key)
+
+
+class TestImportExport(VaultTestCase):
+
+    def import_file(self, filedata, vault_key):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = Path(tmp_dir) / 'credentials.json'
+            file_path.write_text(json.dumps(filedata))
+            with mock.patch('click.prompt', return_value=FILE_PASSWD):
+                import_credentials_from_json(file_path, vault_key)
+
+    def test_legacy_encrypted_export_is_imported(self):
+        self.create_legacy_vault()
+        vault_key = get_cached_vault_key(master_passwd=MASTER_PASSWD)
+
+        # An encrypted export as written by older versions: PBKDF2 file key, Fernet data
+        legacy_file_key = derive_legacy_vault_key(master_key=FILE_PASSWD)
+        credential_key = generate_fernet_key()
+        fernet = Fernet(credential_key)
+        filedata = {
+            'metadata': {
+                'file_encrypted': True,
+                'exported_date': 'Mon, 01 Jul 2024',
+                'file_key_hash': sha256_hash(legacy_file_key)
+            },
+            'credentials': [{
+                'name': 'Imported',
+                'mnemonics': 'imported, imported2',
+                'encrypted_key': Fernet(legacy_file_key).encrypt(credential_key).decode(),
+                **{field: fernet.encrypt(value.encode()).decode() for field, value in CREDENTIAL_DATA.items()}
+            }]
+        }
+
+        self.import_file(filedata, vault_key)
+
+        session.expire_all()
+        credential = session.query(Credential).filter_by(name='Imported').one()
+        self.assertEqual(credential.encryption_algorithm, Credential.DEFAULT_ENCRYPTION_ALGO)
+        self.assertEqual(sorted(mn.name for mn in credential.mnemonics), ['imported', 'imported2'])
+        self.assert_credential_data(credential, vault_key)
+
+    def test_encrypted_export_round_trip(self):
+        self.create_legacy_vault()
+        vault_key = get_cached_vault_key(master_passwd=MASTER_PASSWD)
+        file_key = derive_vault_key(master_key=FILE_PASSWD)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with mock.patch('vaultsafe.commands.export.console'):
+                export_credentials(
+                    credentials=session.query(Credential).all(),
+                    output_dir=tmp_dir,
+                    file_format='json',
+                    vault_key=vault_key,
+                    file_key=file_key
+                )
+            filedata = json.loads((Path(tmp_dir) / 'credentials.json').read_text())
+
+        self.assertEqual(filedata['metadata']['encryption_algorithm'], Credential.DEFAULT_ENCRYPTION_ALGO)
+
+        # Import the export into a fresh vault with a different master password
+        self.setUp()
+        new_vault_key = derive_vault_key(master_key='another password')
+        vault = Vault(vault_key_hash=sha256_hash(new_vault_key))
+        vault.set_master_password_hash('another password')
+        session.add(vault)
+        session.commit()
+
+        self.import_file(filedata, new_vault_key)
+
+        session.expire_all()
+        credential = session.query(Credential).one()
+        self.assertEqual([mn.name for mn in credential.mnemonics], ['legacy'])
+        self.assert_credential_data(credential, new_vault_key)
+
+
+if __name__ == '__main__':
+    unittest.main()
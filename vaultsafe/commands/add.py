@@ -2,13 +2,17 @@
 # Author: Indrajit Ghosh
 # Created On: Jun 12, 2024
 # 
+import sys
+
 import click
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from rich.console import Console
 from rich.panel import Panel
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import get_password, input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt, generate_fernet_key
+from vaultsafe.utils.auth_utils import get_password, input_master_passwd_and_verify, get_cached_vault_key
+from vaultsafe.utils.crypto_utils import encrypt, generate_fernet_key
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info, multiline_input
 
 console = Console()
@@ -69,6 +73,20 @@ def add(name, mnemonics, username, password, recovery_key, url, primary_email, s
     # Take master password
     master_passwd = input_master_passwd_and_verify()
 
+    # Check if any of the provided mnemonics already exist before doing any prompting or key derivation
+    mnemonic_exists_stmt = select(Mnemonic.name).where(
+        Mnemonic.name.in_(bindparam('names', expanding=True))
+    )
+    existing_mnemonic_names = set(
+        session.execute(mnemonic_exists_stmt, {'names': list(mnemonics)}).scalars().all()
+    )
+    duplicate_mnemonics = set(mnemonics) & existing_mnemonic_names
+
+    if duplicate_mnemonics:
+        for mnemonic in sorted(duplicate_mnemonics):
+            console.print(f"[yellow]Note: The mnemonic '{mnemonic}' already exists and cannot be reused for a new credential. Skipped![/yellow]")
+        sys.exit(1)
+
     # Prompt for credential details if not provided as options
     if username:
         username = click.prompt("Enter the username for the credential", default='')
@@ -110,54 +128,59 @@ def add(name, mnemonics, username, password, recovery_key, url, primary_email, s
         notes = multiline_input("Write any notes related to the credential ([red]end with three empty lines[/red]):")
 
     # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
 
     # Generate a new key for the credential
     credential_key = generate_fernet_key()
 
-    # Encrypt credentials
-    encrypted_username = encrypt(username, credential_key) if username else None
-    encrypted_password = encrypt(password, credential_key) if password else None
-    encrypted_url = encrypt(url, credential_key) if url else None
-    encrypted_recovery_key = encrypt(recovery_key, credential_key) if recovery_key else None
-    encrypted_primary_email = encrypt(primary_email, credential_key) if primary_email else None
-    encrypted_secondary_email = encrypt(secondary_email, credential_key) if secondary_email else None
-    encrypted_token = encrypt(token, credential_key) if token else None
-    encrypted_notes = encrypt(notes, credential_key) if notes else None
+    # Encrypt all the provided credential fields with the credential key
+    encrypted_fields = Credential.encrypt_attrs(
+        credential_key,
+        username=username,
+        password=password,
+        url=url,
+        recovery_key=recovery_key,
+        primary_email=primary_email,
+        secondary_email=secondary_email,
+        token=token,
+        notes=notes
+    )
 
     encrypted_credential_key = encrypt(credential_key, vault_key)
 
     # Create the credential object
     credential = Credential(
         name=name,
-        url=encrypted_url,
-        username=encrypted_username,
-        password=encrypted_password,
         encrypted_key=encrypted_credential_key,
-        token=encrypted_token,
-        recovery_key=encrypted_recovery_key,
-        primary_email=encrypted_primary_email,
-        secondary_email=encrypted_secondary_email,
-        notes=encrypted_notes
+        **encrypted_fields
     )
 
-    # Check if any of the provided mnemonics already exist
-    existing_mnemonics = session.query(Mnemonic.name).filter(Mnemonic.name.in_(mnemonics)).all()
-    existing_mnemonic_names = {mnemonic.name for mnemonic in existing_mnemonics}
-
-    for mnemonic in mnemonics:
-        if mnemonic in existing_mnemonic_names:
-            console.print(f"[yellow]Note: The mnemonic '{mnemonic}' already exists and cannot be reused for a new credential. Skipped![/yellow]")
-            return
-
     # Add the credential to the database
     session.add(credential)
-    session.commit()
+    session.flush()
+
+    # Associate mnemonics with the credential, letting SQLite skip any that got taken meanwhile
+    insert_mnemonics = (
+        sqlite_insert(Mnemonic)
+        .values([{'name': mnemonic, 'credential_id': credential.id} for mnemonic in mnemonics])
+        .on_conflict_do_nothing(index_elements=['name'])
+    )
+
+    if getattr(session.get_bind().dialect, 'insert_returning', False):
+        inserted_mnemonics = set(session.scalars(insert_mnemonics.returning(Mnemonic.name)).all())
+    else:
+        # SQLite older than 3.35 has no RETURNING; read back the names within the same transaction
+        session.execute(insert_mnemonics)
+        inserted_mnemonics = set(
+            session.scalars(select(Mnemonic.name).where(Mnemonic.credential_id == credential.id)).all()
+        )
+    duplicate_mnemonics = set(mnemonics) - inserted_mnemonics
 
-    # Associate mnemonics with the credential
-    for mnemonic in mnemonics:
-        mnemonic_entry = Mnemonic(name=mnemonic, credential=credential)
-        session.add(mnemonic_entry)
+    if duplicate_mnemonics:
+        session.rollback()
+        for mnemonic in sorted(duplicate_mnemonics):
+            console.print(f"[yellow]Note: The mnemonic '{mnemonic}' already exists and cannot be reused for a new credential. Skipped![/yellow]")
+        sys.exit(1)
 
     session.commit()
 
@@ -8,7 +8,10 @@ from rich.console import Console
 from rich.panel import Panel
 
 from vaultsafe.db.models import session, Vault, Credential
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
+from vaultsafe.utils.auth_utils import (
+    input_master_passwd_and_verify, get_cached_vault_key, generate_session_token,
+    save_session_token, remove_session_token, remove_vault_key_cache
+)
 from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt, decrypt
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
@@ -36,7 +39,7 @@ def change_master_password():
     old_master_passwd = input_master_passwd_and_verify()
 
     # Derive the old vault key
-    old_vault_key = derive_vault_key(master_key=old_master_passwd)
+    old_vault_key = get_cached_vault_key(master_passwd=old_master_passwd)
 
     # Prompt for new master password
     console.print("[bold]Enter new master password: [/bold]", style="bold cyan", end='')
@@ -69,4 +72,17 @@ def change_master_password():
 
     session.commit()
 
+    # The cached vault key and the saved session belong to the old master password
+    remove_vault_key_cache()
+    if vault.session_check:
+        save_session_token(
+            token=generate_session_token(
+                master_password=new_master_passwd,
+                session_secret_key=vault.session_secret_key,
+                session_salt=vault.session_salt
+            )
+        )
+    else:
+        remove_session_token()
+
     console.print(Panel("[bold green]Master password changed successfully![/bold green]", style="bold green"))
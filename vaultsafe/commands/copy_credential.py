@@ -7,8 +7,8 @@ import pyperclip
 from rich.console import Console
 
 from vaultsafe.db.models import session, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key, decrypt
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_cached_vault_key
+from vaultsafe.utils.crypto_utils import decrypt
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
@@ -56,7 +56,7 @@ def copy_credential(mnemonic, username, password, recovery_key, token, primary_e
     master_passwd = input_master_passwd_and_verify()
     
     # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
 
     # Verify the mnemonic
     mnemonic_entry = session.query(Mnemonic).filter_by(name=mnemonic).first()
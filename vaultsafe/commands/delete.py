@@ -7,8 +7,7 @@ from rich.console import Console
 from rich.prompt import Confirm
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_cached_vault_key
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
@@ -33,7 +32,7 @@ def delete(mnemonic):
     master_passwd = input_master_passwd_and_verify()
     
     # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
 
     if not mnemonic:
         mnemonic = click.prompt("No matching mnemonic found. Please provide the mnemonic associated with the credential to be deleted")
@@ -11,7 +11,7 @@ from rich.panel import Panel
 from rich import print as rprint
 
 from vaultsafe.db.models import session, Credential
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_password
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_cached_vault_key, get_password
 from vaultsafe.utils.crypto_utils import derive_vault_key, decrypt, encrypt, sha256_hash
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 from vaultsafe.utils.general_utils import utcnow, convert_utc_to_local_str
@@ -68,6 +68,7 @@ def export_credentials(credentials, output_dir, file_format, vault_key, file_key
     
     metadata = {
         'file_encrypted': file_encrypted,
+        'encryption_algorithm': Credential.DEFAULT_ENCRYPTION_ALGO,
         'exported_date': current_timestamp
     }
 
@@ -145,7 +146,7 @@ def export(output_dir, file_format, decrypt):
         return
     
     # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
 
 
     if decrypt:
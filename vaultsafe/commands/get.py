@@ -6,8 +6,7 @@ import click
 from rich.console import Console
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_cached_vault_key
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
@@ -43,7 +42,7 @@ def get(mnemonic):
     master_passwd = input_master_passwd_and_verify()
     
     # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
     
     if mnemonic:
         mnemonic_entry = session.query(Mnemonic).filter_by(name=mnemonic).first()
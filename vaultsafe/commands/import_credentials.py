@@ -11,14 +11,14 @@ from rich.panel import Panel
 from rich import print as rprint
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.crypto_utils import encrypt, decrypt, generate_fernet_key, derive_vault_key, sha256_hash
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
+from vaultsafe.utils.crypto_utils import encrypt, decrypt, fernet_decrypt, generate_fernet_key, derive_vault_key, derive_legacy_vault_key, sha256_hash
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_cached_vault_key
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
 
-def _decrypt_attr(attr, key):
-    return decrypt(attr, key) if attr else None
+def _decrypt_attr(attr, key, decrypt_func=decrypt):
+    return decrypt_func(attr, key) if attr else None
 
 
 def import_credentials_from_json(file_path, vault_key):
@@ -41,6 +41,10 @@ def import_credentials_from_json(file_path, vault_key):
     credentials_data = filedata.get('credentials', [])
 
     file_encrypted = metadata.get('file_encrypted')
+
+    # Files exported by older versions are encrypted with the legacy Fernet algorithm
+    legacy_algorithm = metadata.get('encryption_algorithm', Credential.LEGACY_ENCRYPTION_ALGO) == Credential.LEGACY_ENCRYPTION_ALGO
+    _decrypt = fernet_decrypt if legacy_algorithm else decrypt
     
     if file_encrypted:
         # Ask the user for the file password.
@@ -51,6 +55,10 @@ def import_credentials_from_json(file_path, vault_key):
 
         # Match the file key hash
         file_key_hash = metadata.get('file_key_hash')
+        if not file_key_hash == sha256_hash(file_key):
+            # Files exported by older versions use the legacy PBKDF2 file key
+            file_key = derive_legacy_vault_key(master_key=file_passwd)
+
         if not file_key_hash == sha256_hash(file_key):
             err_message = "[red]Error:[/red] The password you entered is incorrect. Please try again."
             rprint('\n', Panel(err_message, title="Password Error", title_align="left", highlight=True, padding=1), '\n')
@@ -65,16 +73,16 @@ def import_credentials_from_json(file_path, vault_key):
             old_credential_key_encrypted = data.get('encrypted_key').encode()
 
             # Decrypt the key
-            old_credential_key = decrypt(old_credential_key_encrypted, file_key)
+            old_credential_key = _decrypt(old_credential_key_encrypted, file_key)
 
-        url = _decrypt_attr(data.get('url'), old_credential_key) if file_encrypted else data.get('url')
-        username = _decrypt_attr(data.get('username'), old_credential_key) if file_encrypted else data.get('username')
-        password = _decrypt_attr(data.get('password'), old_credential_key) if file_encrypted else data.get('password')
-        recovery_key = _decrypt_attr(data.get('recovery_key'), old_credential_key) if file_encrypted else data.get('recovery_key')
-        primary_email = _decrypt_attr(data.get('primary_email'), old_credential_key) if file_encrypted else data.get('primary_email')
-        secondary_email = _decrypt_attr(data.get('secondary_email'), old_credential_key) if file_encrypted else data.get('secondary_email')
-        token = _decrypt_attr(data.get('token'), old_credential_key) if file_encrypted else data.get('token')
-        notes = _decrypt_attr(data.get('notes'), old_credential_key) if file_encrypted else data.get('notes')
+        url = _decrypt_attr(data.get('url'), old_credential_key, _decrypt) if file_encrypted else data.get('url')
+        username = _decrypt_attr(data.get('username'), old_credential_key, _decrypt) if file_encrypted else data.get('username')
+        password = _decrypt_attr(data.get('password'), old_credential_key, _decrypt) if file_encrypted else data.get('password')
+        recovery_key = _decrypt_attr(data.get('recovery_key'), old_credential_key, _decrypt) if file_encrypted else data.get('recovery_key')
+        primary_email = _decrypt_attr(data.get('primary_email'), old_credential_key, _decrypt) if file_encrypted else data.get('primary_email')
+        secondary_email = _decrypt_attr(data.get('secondary_email'), old_credential_key, _decrypt) if file_encrypted else data.get('secondary_email')
+        token = _decrypt_attr(data.get('token'), old_credential_key, _decrypt) if file_encrypted else data.get('token')
+        notes = _decrypt_attr(data.get('notes'), old_credential_key, _decrypt) if file_encrypted else data.get('notes')
 
         mnemonics = list(set([m.strip() for m in data.get('mnemonics', '').split(',') if m.strip()]))
 
@@ -90,29 +98,25 @@ def import_credentials_from_json(file_path, vault_key):
             # Generate a new key for the credential
             credential_key = generate_fernet_key()
 
-            # Encrypt credentials
-            encrypted_username = encrypt(username, credential_key) if username else None
-            encrypted_password = encrypt(password, credential_key) if password else None
-            encrypted_url = encrypt(url, credential_key) if url else None
-            recovery_key_encrypted = encrypt(recovery_key, credential_key) if recovery_key else None
-            primary_email_encrypted = encrypt(primary_email, credential_key) if primary_email else None
-            secondary_email_encrypted = encrypt(secondary_email, credential_key) if secondary_email else None
-            token_encrypted = encrypt(token, credential_key) if token else None
-            notes_encrypted = encrypt(notes, credential_key) if notes else None
+            # Encrypt all the provided credential fields with the credential key
+            encrypted_fields = Credential.encrypt_attrs(
+                credential_key,
+                username=username,
+                password=password,
+                url=url,
+                recovery_key=recovery_key,
+                primary_email=primary_email,
+                secondary_email=secondary_email,
+                token=token,
+                notes=notes
+            )
             encrypted_credential_key = encrypt(credential_key, vault_key)
 
             # Create the credential object
             credential = Credential(
                 name=name,
-                url=encrypted_url,
-                username=encrypted_username,
-                password=encrypted_password,
                 encrypted_key=encrypted_credential_key,
-                recovery_key=recovery_key_encrypted,
-                primary_email=primary_email_encrypted,
-                secondary_email=secondary_email_encrypted,
-                token=token_encrypted,
-                notes=notes_encrypted
+                **encrypted_fields
             )
 
             # Add the credential to the database
@@ -162,7 +166,7 @@ def import_credentials(file_path, format):
     master_passwd = input_master_passwd_and_verify()
     
     # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
 
     if format == 'json':
         import_credentials_from_json(file_path, vault_key)
@@ -9,8 +9,8 @@ from rich.console import Console
 from rich.prompt import Prompt
 
 from vaultsafe.db.models import session, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key, decrypt
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_cached_vault_key
+from vaultsafe.utils.crypto_utils import decrypt
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
@@ -40,7 +40,7 @@ def open(mnemonic):
     master_passwd = input_master_passwd_and_verify()
     
     # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
 
     # Take the mnemonic if not given
     mnemonic = Prompt.ask("Enter the mnemonic of the credential: ") if mnemonic is None else mnemonic
@@ -2,12 +2,28 @@
 # Author: Indrajit Ghosh
 # Created On: Jun 13, 2024
 #
+import os
+import sys
+import subprocess
+
 import click
-import webbrowser
 
 from vaultsafe.config import DEFAULT_SERVER_PORT
-from vaultsafe.web import create_app
-from vaultsafe.config import Config
+
+def _open_url(url:str):
+    """
+    Open the url in the default browser by spawning the platform's opener
+    directly, falling back to `webbrowser` only if that is not possible.
+    """
+    try:
+        if sys.platform.startswith('win'):
+            os.startfile(url)
+            return
+        opener = 'open' if sys.platform == 'darwin' else 'xdg-open'
+        subprocess.Popen([opener, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        import webbrowser
+        webbrowser.open(url)
 
 @click.command()
 @click.option('--port', default=DEFAULT_SERVER_PORT, help=f'Port for the Flask server (default is {DEFAULT_SERVER_PORT})')
@@ -29,9 +45,19 @@ def server(port):
     $ vaultsafe server --port 9000
     Starts the server on port 9000.
     """
+    # Flask is only needed when the server actually runs
+    from vaultsafe.web import create_app
+    from vaultsafe.config import Config
+
     app = create_app(Config)
 
-    webbrowser.open(f"http://localhost:{port}")
+    # Spawn the browser before serving so that it starts while the server binds
+    _open_url(f"http://localhost:{port}")
 
-    # Start the Flask server
-    app.run(port=port)
+    if Config.DEBUG:
+        # Use Flask's development server (with debugger) in dev mode
+        app.run(port=port)
+    else:
+        # Serve the app with a production WSGI server handling requests concurrently
+        from waitress import serve
+        serve(app, host='127.0.0.1', port=port, threads=8)
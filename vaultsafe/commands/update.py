@@ -7,8 +7,8 @@ from rich.console import Console
 from rich.panel import Panel
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_password
-from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt, decrypt
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_cached_vault_key, get_password
+from vaultsafe.utils.crypto_utils import encrypt, decrypt
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info, multiline_input
 
 console = Console()
@@ -90,7 +90,7 @@ def update(mnemonic, name, mnemonics, username, password, token, recovery_key, u
         return
 
     # Derive vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
     credential_key = credential.get_decrypted_key(vault_key=vault_key)
 
     # Display existing values before updating
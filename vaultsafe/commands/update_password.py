@@ -8,8 +8,8 @@ from rich.console import Console
 from rich.panel import Panel
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_password
-from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_cached_vault_key, get_password
+from vaultsafe.utils.crypto_utils import encrypt
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
@@ -54,7 +54,7 @@ def update_password(mnemonic, password, token, recovery_key):
     master_passwd = input_master_passwd_and_verify()
 
     # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    vault_key = get_cached_vault_key(master_passwd=master_passwd)
 
     # Get the cred_key
     cred_key = credential.get_decrypted_key(vault_key=vault_key)
@@ -22,6 +22,7 @@ DOT_VAULTSAFE_DIR = Path.home() / '.vaultsafe' if DEV_MODE != 'on' else Path.cwd
 DATABASE_PATH = DOT_VAULTSAFE_DIR / 'vaultsafe.db'
 DATABASE_URL = f'sqlite:///{DATABASE_PATH}'
 DOT_SESSION_FILE = DOT_VAULTSAFE_DIR / '.session'
+DOT_VAULT_KEY_CACHE_FILE = DOT_VAULTSAFE_DIR / '.vault_key'
 
 # Basic information
 APP_NAME = "VaultSafe"
@@ -8,22 +8,27 @@ import socket
 from datetime import datetime
 
 import pyperclip
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
 
-from vaultsafe.utils.crypto_utils import sha256_hash, decrypt, generate_session_secret_key
+from vaultsafe.utils.crypto_utils import sha256_hash, decrypt, batch_encrypt, batch_decrypt, generate_session_secret_key
 from vaultsafe.utils.general_utils import utcnow, convert_utc_to_local_str
 from vaultsafe.commands.generate_strong_passwd import generate_strong_password
 from vaultsafe.config import DATABASE_URL
 
 Base = declarative_base()
 
+# Hasher used to store and verify the master password
+password_hasher = PasswordHasher()
+
 class Vault(Base):
     __tablename__ = 'vault'
     id = Column(Integer, primary_key=True)
@@ -53,21 +58,47 @@ class Vault(Base):
 
     def set_master_password_hash(self, master_password: str):
         """
-        Sets the master password hash from the provided master password.
+        Sets the Argon2 verifier hash from the provided master password.
 
         Args:
             master_password (str): The master password to be hashed and stored.
         """
-        self.password_salt = generate_strong_password(25)
-        self.master_password_hash = sha256_hash(master_password + self.password_salt)
+        # The Argon2 hash embeds its own random salt
+        self.password_salt = ''
+        self.master_password_hash = password_hasher.hash(master_password)
+
+    def _has_legacy_password_hash(self):
+        """Whether the master password hash is the salted SHA-256 used by older versions."""
+        return not self.master_password_hash.startswith('$argon2')
 
     def check_password(self, raw_password: str):
-        """Checks whether the password is correct"""
-        if sha256_hash(raw_password + self.password_salt) == self.master_password_hash:
-            return True
-        else:
+        """Checks whether the password is correct. The stored hash is left untouched."""
+        if self._has_legacy_password_hash():
+            return sha256_hash(raw_password + self.password_salt) == self.master_password_hash
+
+        try:
+            return password_hasher.verify(self.master_password_hash, raw_password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_password_rehash(self):
+        """Whether the master password hash should be recomputed with the current Argon2 parameters."""
+        return self._has_legacy_password_hash() or password_hasher.check_needs_rehash(self.master_password_hash)
+
+    def upgrade_password_hash(self, raw_password: str):
+        """
+        Replaces a legacy (or outdated) master password hash with the current Argon2
+        one. Call it only after `check_password` succeeded; the caller commits.
+
+        Returns:
+            bool: Whether the hash was upgraded.
+        """
+        if not self.needs_password_rehash():
             return False
 
+        self.set_master_password_hash(raw_password)
+        return True
+
     def json(self):
         """
         Serialize the Vault instance to a JSON-compatible dictionary.
@@ -129,7 +160,12 @@ class Mnemonic(Base):
 class Credential(Base):
     __tablename__ = 'credential'
     NONE_STR = "Not Provided"
-    DEFAULT_ENCRYPTION_ALGO = "Fernet"
+    DEFAULT_ENCRYPTION_ALGO = "AES-256-GCM"
+    LEGACY_ENCRYPTION_ALGO = "Fernet"
+    ENCRYPTED_FIELDS = (
+        'url', 'username', 'password', 'recovery_key',
+        'primary_email', 'secondary_email', 'token', 'notes'
+    )
 
     id = Column(Integer, primary_key=True)
     uuid = Column(String, default=lambda: uuid.uuid4().hex)  # Optional, defaults to a generated UUID
@@ -178,6 +214,27 @@ class Credential(Base):
             + "\n)"
         )
     
+    @classmethod
+    def encrypt_attrs(cls, credential_key, **attrs):
+        """
+        Encrypts the provided (non-empty) attributes with the credential key.
+
+        Args:
+            credential_key (bytes or str): The key of the credential.
+            **attrs: Raw values keyed by names from `ENCRYPTED_FIELDS`; empty values are skipped.
+
+        Returns:
+            dict: The encrypted attributes, ready to be passed to `Credential(...)`.
+        """
+        unknown = set(attrs) - set(cls.ENCRYPTED_FIELDS)
+        if unknown:
+            raise ValueError(f"Not encrypted Credential attributes: {', '.join(sorted(unknown))}")
+
+        return batch_encrypt(
+            {field: attrs[field] for field in cls.ENCRYPTED_FIELDS if attrs.get(field)},
+            credential_key
+        )
+
     def get_decrypted_key(self, vault_key):
         """
         Returns the decrypted key that can be further used to decrypt all
@@ -200,23 +257,19 @@ class Credential(Base):
         Returns:
             dict: A dictionary containing the object's data, with decrypted attributes if a `vault_key` is provided.
         """
-        def decrypt_attr(attr, key):
-            return decrypt(attr, key) if attr else self.NONE_STR
-
         decrypted_data = {}
         if vault_key:
             # Get the decrypted_key
             credential_key = self.get_decrypted_key(vault_key=vault_key)
 
+            # Decrypt all the provided attributes with the credential key at once
+            decrypted_attrs = batch_decrypt(
+                {field: getattr(self, field) for field in self.ENCRYPTED_FIELDS if getattr(self, field)},
+                credential_key
+            )
+
             decrypted_data = {
-                'url': decrypt_attr(self.url, credential_key),
-                'username': decrypt_attr(self.username, credential_key),
-                'password': decrypt_attr(self.password, credential_key),
-                'recovery_key': decrypt_attr(self.recovery_key, credential_key),
-                'primary_email': decrypt_attr(self.primary_email, credential_key),
-                'secondary_email': decrypt_attr(self.secondary_email, credential_key),
-                'token': decrypt_attr(self.token, credential_key),
-                'notes': decrypt_attr(self.notes, credential_key)
+                field: decrypted_attrs.get(field, self.NONE_STR) for field in self.ENCRYPTED_FIELDS
             }
         else:
             decrypted_data = {
@@ -318,7 +371,23 @@ class Credential(Base):
 
 
 engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
 
-# Create a session
-session = Session()
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Use write-ahead logging with `synchronous=NORMAL` so that a commit costs a
+    single fsync, keep temporary tables in memory and memory-map the database file.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+# Sessions are thread-local: the CLI works with a single session, while every
+# request of the (multi-threaded) web server gets its own
+Session = scoped_session(sessionmaker(bind=engine))
+
+# The session proxy, which forwards to the session of the current thread
+session = Session
@@ -2,6 +2,7 @@
 # Author: Indrajit Ghosh
 # Created On: Jun 12, 2024
 #
+import os
 import sys
 
 import pwinput
@@ -11,8 +12,9 @@ from itsdangerous import URLSafeTimedSerializer
 from rich.console import Console
 from rich.panel import Panel
 
-from vaultsafe.db.models import session, Vault
-from vaultsafe.config import DOT_SESSION_FILE
+from vaultsafe.db.models import session, Vault, Credential
+from vaultsafe.utils.crypto_utils import derive_vault_key, derive_legacy_vault_key, sha256_hash, encrypt, decrypt, fernet_decrypt
+from vaultsafe.config import DOT_SESSION_FILE, DOT_VAULT_KEY_CACHE_FILE
 
 console = Console()
 
@@ -91,6 +93,10 @@ def input_master_passwd_and_verify():
         console.print(Panel("[bold red]Sorry, wrong password![/bold red]", border_style="red"))
         sys.exit(1)
 
+    # Replace a legacy (or outdated) master password hash with the current one
+    if vault.upgrade_password_hash(master_passwd):
+        session.commit()
+
     console.print(Panel("[bold green]Master password verified successfully![/bold green]", border_style="green"))
 
     # Generate a session token from the master_passwd
@@ -105,6 +111,140 @@ def input_master_passwd_and_verify():
 
     return master_passwd
 
+def _migrate_credentials(credentials, old_vault_key, new_vault_key):
+    """
+    Re-encrypt the key of each credential from `old_vault_key` to `new_vault_key`.
+    Credentials still stored with the legacy Fernet algorithm are re-encrypted
+    with AES-256-GCM on the way.
+    """
+    for cred in credentials:
+        legacy = cred.encryption_algorithm in (Credential.LEGACY_ENCRYPTION_ALGO, None)
+        _decrypt = fernet_decrypt if legacy else decrypt
+
+        cred_key = _decrypt(cred.encrypted_key, old_vault_key)
+
+        if legacy:
+            for field in Credential.ENCRYPTED_FIELDS:
+                value = getattr(cred, field)
+                if value:
+                    setattr(cred, field, encrypt(fernet_decrypt(value, cred_key), cred_key))
+            cred.encryption_algorithm = Credential.DEFAULT_ENCRYPTION_ALGO
+
+        cred.encrypted_key = encrypt(cred_key, new_vault_key)
+
+def _migrate_legacy_algorithm(vault_key):
+    """Re-encrypt (once) the credentials that are still stored with the legacy Fernet algorithm."""
+    legacy_credentials = session.query(Credential).filter(
+        (Credential.encryption_algorithm == Credential.LEGACY_ENCRYPTION_ALGO)
+        | (Credential.encryption_algorithm.is_(None))
+    ).all()
+
+    if legacy_credentials:
+        _migrate_credentials(legacy_credentials, vault_key, vault_key)
+        session.commit()
+
+def _derive_and_migrate_vault_key(vault:Vault, master_passwd:str):
+    """
+    Derive the `vault_key` from the master password. If the Vault was created
+    with the legacy PBKDF2 `vault_key`, every credential key is re-encrypted
+    with the new Argon2id `vault_key` and the Vault's `vault_key_hash` is updated.
+    """
+    vault_key = derive_vault_key(master_key=master_passwd)
+
+    if sha256_hash(vault_key) != vault.vault_key_hash:
+        legacy_vault_key = derive_legacy_vault_key(master_key=master_passwd)
+
+        if sha256_hash(legacy_vault_key) == vault.vault_key_hash:
+            _migrate_credentials(session.query(Credential).all(), legacy_vault_key, vault_key)
+            vault.set_vault_key_hash(vault_key)
+            session.commit()
+
+    if sha256_hash(vault_key) != vault.vault_key_hash:
+        _abort_vault_key_mismatch()
+
+    _migrate_legacy_algorithm(vault_key)
+
+    return vault_key
+
+def _abort_vault_key_mismatch():
+    """
+    Exit because the master password in use does not unlock the Vault, e.g. when a
+    stale session still holds a previous master password. The session and the
+    cached `vault_key` are cleared so that the next command asks for the password.
+    """
+    remove_vault_key_cache()
+    remove_session_token()
+    console.print(Panel("[bold red]The master password does not unlock this vault (the saved session may be stale). Please run the command again.[/bold red]", border_style="red"))
+    sys.exit(1)
+
+def _remove_file(path):
+    """Delete the file at `path`, if any."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _write_private_file(path, content:str):
+    """Write `content` to a file readable only by the owner (0600)."""
+    # Remove any existing file first, since `os.open` only applies the mode on creation
+    _remove_file(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+
+def remove_vault_key_cache():
+    """Delete the cached `vault_key` file, if any."""
+    _remove_file(DOT_VAULT_KEY_CACHE_FILE)
+
+def get_cached_vault_key(master_passwd:str):
+    """
+    Get the `vault_key` for an already verified master password.
+
+    The key derivation is deliberately expensive, so while session check is
+    enabled the derived `vault_key` is cached in `DOT_VAULT_KEY_CACHE_FILE` and
+    re-used by subsequent commands until the session expires. The token is only
+    signed and timestamped, not encrypted: the `vault_key` is stored readable in
+    the file, which is protected solely by its owner-only (0600) permissions --
+    the same protection `DOT_SESSION_FILE` gives the master password itself.
+    Only a key matching the `vault_key_hash` stored in the Vault is ever cached
+    or returned; an expired, invalid or mismatching cache file is deleted.
+
+    :param master_passwd: The verified master password.
+    :return: The `vault_key` as URL-safe base64-encoded bytes.
+    """
+    vault = session.query(Vault).first()
+
+    if not vault.session_check:
+        remove_vault_key_cache()
+        return _derive_and_migrate_vault_key(vault, master_passwd)
+
+    serializer = URLSafeTimedSerializer(
+        secret_key=vault.session_secret_key, salt=vault.session_salt + '-vault-key'
+    )
+
+    if DOT_VAULT_KEY_CACHE_FILE.exists():
+        with open(DOT_VAULT_KEY_CACHE_FILE, 'r') as f:
+            token = f.read()
+
+        try:
+            vault_key = serializer.loads(token, max_age=vault.session_expiration).get('vault_key')
+        except itsdangerous.BadSignature:
+            vault_key = None  # Token expired or invalid
+
+        if vault_key and sha256_hash(vault_key) == vault.vault_key_hash:
+            vault_key = vault_key.encode()
+            _migrate_legacy_algorithm(vault_key)
+            return vault_key
+
+        # Do not leave a stale vault key lying around on disk
+        remove_vault_key_cache()
+
+    vault_key = _derive_and_migrate_vault_key(vault, master_passwd)
+
+    _write_private_file(DOT_VAULT_KEY_CACHE_FILE, serializer.dumps({'vault_key': vault_key.decode()}))
+
+    return vault_key
+
 def generate_session_token(master_password:str, session_secret_key:str, session_salt:str):
     """
     Generate a session token using the master password hash.
@@ -152,8 +292,11 @@ def confirm_session_token(token: str, session_secret_key, session_salt, expirati
 
 def save_session_token(token:str):
     """Save the session token"""
-    with open(DOT_SESSION_FILE, 'w') as f:
-        f.write(token)
+    _write_private_file(DOT_SESSION_FILE, token)
+
+def remove_session_token():
+    """Delete the saved session token, if any."""
+    _remove_file(DOT_SESSION_FILE)
 
 def get_existing_session_token():
     """Get the existing session token from the file"""
@@ -9,7 +9,6 @@ from datetime import date
 
 import pwinput
 from rich.console import Console
-from rich.table import Table
 from rich.panel import Panel
 
 from vaultsafe.version import __version__
@@ -17,9 +16,25 @@ from vaultsafe.config import APP_NAME, COPYRIGHT_STATEMENT, DATABASE_PATH, GITHU
 
 console = Console()
 
+# A line break followed by three empty lines ends the input of `multiline_input`
+_MULTILINE_TERMINATOR = "\n" * 4
+
 def clear_terminal_screen():
-    """Clears the terminal screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """
+    Clears the terminal screen.
+
+    VT-capable terminals are cleared with ANSI escape codes instead of forking
+    `clear`; `cls` is only spawned on legacy Windows consoles without ANSI support.
+    """
+    if not sys.stdout.isatty():
+        return
+
+    if os.name == 'nt' and console.legacy_windows:
+        os.system('cls')
+    elif os.environ.get('TERM') != 'dumb':
+        # Move the cursor home, clear the screen and the scrollback buffer (like `clear`)
+        sys.stdout.write('\x1b[H\x1b[2J\x1b[3J')
+        sys.stdout.flush()
 
 def input_password(info_msg="Enter your password: "):
     bullet_unicode = '\u2022'
@@ -27,20 +42,28 @@ def input_password(info_msg="Enter your password: "):
     return pw
 
 def multiline_input(prompt):
-    """Prompt the user for multiline input."""
+    """
+    Prompt the user for multiline input, terminated by three empty lines (or EOF).
+
+    Piped input is read with a single `sys.stdin.read()`; on a terminal lines are
+    read until the terminating empty lines so the user does not need to send EOF.
+    """
     console.print(Panel(prompt, title="Input", style="bold blue"))
-    lines = []
-    empty_line_count = 0
-    while True:
-        line = input()
-        if line == "":
-            empty_line_count += 1
-            if empty_line_count == 3:
+
+    if sys.stdin.isatty():
+        lines = []
+        while lines[-3:] != ["\n"] * 3:
+            line = sys.stdin.readline()
+            if not line:
                 break
-        else:
-            empty_line_count = 0
-        lines.append(line)
-    return "\n".join(lines[:-2])
+            lines.append(line)
+        data = "".join(lines)
+    else:
+        data = sys.stdin.read()
+
+    # A leading newline lets three empty lines at the very start match the terminator too
+    body, _, _ = ("\n" + data).partition(_MULTILINE_TERMINATOR)
+    return body[1:].rstrip("\n")
 
 def check_db_init():
     """Checks whether db is initialized or not."""
@@ -62,6 +85,13 @@ def print_basic_info():
 
     clear_terminal_screen()
 
+    # Skip the rich layout entirely when the output is not a terminal (e.g. scripts)
+    if not console.is_terminal:
+        print(f"{APP_NAME} {__version__}")
+        return
+
+    from rich.table import Table
+
     # Create title with centered alignment
     title = Panel(f"{APP_NAME} - Password Manager App\nGitHub: {GITHUB_REPO}", title=f"{APP_NAME}", title_align="center", style="bold white on blue", border_style="bright_blue")
 
@@ -74,4 +104,4 @@ def print_basic_info():
     # Print title and information table
     console.print(title)
     console.print(info_table)
-    console.print("\n")
\ No newline at end of file
+    console.print("\n")
@@ -2,12 +2,70 @@
 # Author: Indrajit Ghosh
 # Created On: Jun 12, 2024
 #
+import os
 import hashlib
 import base64
 import string
 import secrets
+import warnings
 
+from argon2.low_level import hash_secret_raw, Type
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.backends.openssl.backend import backend as openssl_backend
+
+# OpenSSL 1.1.1 is the oldest release whose EVP layer reliably picks the hardware
+# accelerated (AES-NI / ARMv8 CE) AES-GCM implementation used for encryption.
+MIN_OPENSSL_VERSION_NUMBER = 0x10101000
+
+# Size in bytes of the random nonce stored in front of every AES-GCM ciphertext.
+AESGCM_NONCE_SIZE = 12
+
+# Bit of the first `OPENSSL_ia32cap` word that advertises AES-NI (CPUID.1:ECX bit 25).
+_IA32CAP_AESNI_BIT = 1 << 57
+
+
+def _aesni_disabled_by_env():
+    """
+    Checks whether AES-NI has been masked off through the `OPENSSL_ia32cap` environment variable.
+
+    Returns:
+        bool: True if the variable explicitly clears the AES-NI capability bit.
+    """
+    ia32cap = os.environ.get('OPENSSL_ia32cap', '').split(':')[0].strip()
+    if not ia32cap:
+        return False
+
+    clear_bits = ia32cap.startswith('~')
+    try:
+        mask = int(ia32cap.lstrip('~'), 0)
+    except ValueError:
+        return False
+
+    return bool(mask & _IA32CAP_AESNI_BIT) if clear_bits else not mask & _IA32CAP_AESNI_BIT
+
+
+def check_openssl_aes_support():
+    """
+    Warns if the OpenSSL build backing `cryptography` is too old, or configured,
+    to use hardware accelerated AES for encryption and decryption.
+    """
+    if openssl_backend.openssl_version_number() < MIN_OPENSSL_VERSION_NUMBER:
+        warnings.warn(
+            f"{openssl_backend.openssl_version_text()} is older than OpenSSL 1.1.1; "
+            "hardware accelerated AES may not be available.",
+            RuntimeWarning
+        )
+
+    if _aesni_disabled_by_env():
+        warnings.warn(
+            "AES-NI is disabled via the OPENSSL_ia32cap environment variable; "
+            "falling back to the slower software AES implementation.",
+            RuntimeWarning
+        )
+
+
+check_openssl_aes_support()
 
 def sha256_hash(data: str):
     """
@@ -26,9 +84,42 @@ def sha256_hash(data: str):
     return sha256_hash
 
 
-def derive_vault_key(master_key: str, key_length: int = 32, iterations: int = 100000):
+KEY_DERIVATION_SALT = "salt-for-key-derivation-from-master-key".encode()
+
+
+def derive_vault_key(master_key: str, key_length: int = 32, time_cost: int = 3, memory_cost: int = 262144, parallelism: int = 2):
     """
-    Derives a `vault_key` from the master key using PBKDF2 and encodes it in URL-safe base64 format.
+    Derives a `vault_key` from the master key using Argon2id and encodes it in URL-safe base64 format.
+
+    Args:
+        master_key (str): The master key from which the derived key will be generated.
+        key_length (int): The length of the derived key in bytes. Default is 32.
+        time_cost (int): The number of Argon2 iterations. Default is 3.
+        memory_cost (int): The amount of memory used by Argon2 in KiB. Default is 262144 (256 MiB).
+        parallelism (int): The number of parallel Argon2 lanes. Default is 2.
+
+    Returns:
+        bytes: The derived key as a URL-safe base64-encoded bytes object.
+    """
+    key = hash_secret_raw(
+        secret=master_key.encode(),
+        salt=KEY_DERIVATION_SALT,
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        hash_len=key_length,
+        type=Type.ID
+    )
+    encoded_key = base64.urlsafe_b64encode(key)
+    return encoded_key
+
+
+def derive_legacy_vault_key(master_key: str, key_length: int = 32, iterations: int = 100000):
+    """
+    Derives a `vault_key` from the master key using PBKDF2, as done by older versions of the app.
+
+    This is only needed to open (and migrate) vaults and exported files created before
+    the switch to Argon2id.
 
     Args:
         master_key (str): The master key from which the derived key will be generated.
@@ -38,44 +129,126 @@ def derive_vault_key(master_key: str, key_length: int = 32, iterations: int = 10
     Returns:
         bytes: The derived key as a URL-safe base64-encoded bytes object.
     """
-    salt = "salt-for-key-derivation-from-master-key".encode()  # Ensure the salt is in bytes
-    key = hashlib.pbkdf2_hmac('sha256', master_key.encode(), salt, iterations, dklen=key_length)
+    key = hashlib.pbkdf2_hmac('sha256', master_key.encode(), KEY_DERIVATION_SALT, iterations, dklen=key_length)
     encoded_key = base64.urlsafe_b64encode(key)
     return encoded_key
 
 
 def generate_fernet_key():
     """
-    Generates a new Fernet key for encryption and decryption.
+    Generates a new random 256-bit key for encryption and decryption.
+
+    The key has the same URL-safe base64 format as a Fernet key, so keys of
+    credentials created before the switch to AES-256-GCM remain valid.
 
     Returns:
-        bytes: The generated Fernet key.
+        bytes: The generated key.
     """
     return Fernet.generate_key()
 
 
+def _aesgcm(key):
+    """Returns an `AESGCM` instance for a URL-safe base64-encoded 256-bit key."""
+    if isinstance(key, str):
+        key = key.encode()
+    return AESGCM(base64.urlsafe_b64decode(key))
+
+
+def _aesgcm_encrypt(aesgcm: AESGCM, data, nonce: bytes = None):
+    """
+    Encrypts `data` with the given nonce (a fresh one if not provided) and returns
+    the URL-safe base64 encoding of `nonce||ciphertext`.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+
+    if nonce is None:
+        nonce = os.urandom(AESGCM_NONCE_SIZE)
+    return base64.urlsafe_b64encode(nonce + aesgcm.encrypt(nonce, data, None))
+
+
+def _aesgcm_decrypt(aesgcm: AESGCM, encrypted_data):
+    """Decrypts the URL-safe base64 encoding of `nonce||ciphertext` produced by `_aesgcm_encrypt`."""
+    if isinstance(encrypted_data, str):
+        encrypted_data = encrypted_data.encode()
+
+    raw = base64.urlsafe_b64decode(encrypted_data)
+    nonce, ciphertext = raw[:AESGCM_NONCE_SIZE], raw[AESGCM_NONCE_SIZE:]
+    return aesgcm.decrypt(nonce, ciphertext, None).decode()
+
+
 def encrypt(data, key):
     """
-    Encrypts the input data using the provided Fernet key.
+    Encrypts the input data with AES-256-GCM using the provided key.
 
     Args:
         data (str or bytes): The raw data to encrypt.
-        key (bytes or str): The Fernet key for encryption.
+        key (bytes or str): The URL-safe base64-encoded key for encryption.
 
     Returns:
-        bytes: The encrypted data.
+        bytes: The encrypted data (URL-safe base64 of the nonce followed by the ciphertext).
     """
-    fernet = Fernet(key)
-    if isinstance(data, str):
-        data = data.encode()
+    return _aesgcm_encrypt(_aesgcm(key), data)
+
+
+def batch_encrypt(fields: dict, key):
+    """
+    Encrypts several values with the same key, parsing the key and drawing
+    the random nonces only once.
+
+    Args:
+        fields (dict): Mapping of field names to the raw data (str or bytes) to encrypt.
+        key (bytes or str): The URL-safe base64-encoded key for encryption.
+
+    Returns:
+        dict: Mapping of the same field names to their encrypted data (bytes).
+    """
+    aesgcm = _aesgcm(key)
+
+    # Draw the nonces for all the fields with a single call to the OS random generator
+    nonce_pool = os.urandom(AESGCM_NONCE_SIZE * len(fields))
 
-    encrypted_data = fernet.encrypt(data)
-    return encrypted_data
+    return {
+        field: _aesgcm_encrypt(aesgcm, data, nonce_pool[i * AESGCM_NONCE_SIZE:(i + 1) * AESGCM_NONCE_SIZE])
+        for i, (field, data) in enumerate(fields.items())
+    }
 
 
 def decrypt(encrypted_data: bytes, key):
     """
-    Decrypts the encrypted data using the provided Fernet key.
+    Decrypts data encrypted by `encrypt` using the provided key.
+
+    Args:
+        encrypted_data (bytes): The encrypted data to decrypt.
+        key (bytes or str): The URL-safe base64-encoded key for decryption.
+
+    Returns:
+        str: The decrypted raw data.
+    """
+    return _aesgcm_decrypt(_aesgcm(key), encrypted_data)
+
+
+def batch_decrypt(fields: dict, key):
+    """
+    Decrypts several values encrypted with the same key, parsing the key only once.
+
+    Args:
+        fields (dict): Mapping of field names to the encrypted data (bytes or str).
+        key (bytes or str): The URL-safe base64-encoded key for decryption.
+
+    Returns:
+        dict: Mapping of the same field names to their decrypted raw data (str).
+    """
+    aesgcm = _aesgcm(key)
+    return {field: _aesgcm_decrypt(aesgcm, data) for field, data in fields.items()}
+
+
+def fernet_decrypt(encrypted_data: bytes, key):
+    """
+    Decrypts data encrypted with Fernet, as done by older versions of the app.
+
+    This is only needed to migrate credentials and exported files created before
+    the switch to AES-256-GCM.
 
     Args:
         encrypted_data (bytes): The encrypted data to decrypt.
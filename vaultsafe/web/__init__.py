@@ -8,6 +8,13 @@ def create_app(config_class):
     # Import routes
     from vaultsafe.web.routes import bp
     app.register_blueprint(bp)
+
+    # Discard the database session of the request's thread once the request ends
+    from vaultsafe.db.models import Session
+
+    @app.teardown_appcontext
+    def remove_db_session(exception=None):
+        Session.remove()
     
     return app
 
@@ -4,7 +4,8 @@ from functools import wraps
 from flask import render_template, redirect, url_for, flash, request, session, Blueprint
 
 from vaultsafe.db.models import Vault, Credential, Mnemonic, session as db_session
-from vaultsafe.utils.crypto_utils import encrypt, derive_vault_key, generate_fernet_key
+from vaultsafe.utils.crypto_utils import encrypt, generate_fernet_key
+from vaultsafe.utils.auth_utils import get_cached_vault_key
 from vaultsafe.utils.general_utils import convert_utc_to_local_str
 from vaultsafe.config import DATABASE_PATH
 
@@ -35,10 +36,14 @@ def login():
         master_passwd = request.form['master_passwd']
         vault = db_session.query(Vault).first()
         if vault.check_password(master_passwd):
+            # Replace a legacy (or outdated) master password hash with the current one
+            if vault.upgrade_password_hash(master_passwd):
+                db_session.commit()
+
             session['logged_in'] = True
 
             # Generate the vault_key
-            vault_key = derive_vault_key(master_key=master_passwd)
+            vault_key = get_cached_vault_key(master_passwd=master_passwd)
 
             # Save the vault_key to the session
             session['vault_key'] = vault_key
@@ -79,30 +84,26 @@ def add_credential():
         # Generate a new key for the credential
         credential_key = generate_fernet_key()
 
-        # Encrypt credentials
-        encrypted_username = encrypt(username, credential_key) if username else None
-        encrypted_password = encrypt(password, credential_key) if password else None
-        encrypted_url = encrypt(url, credential_key) if url else None
-        encrypted_recovery_key = encrypt(recovery_key, credential_key) if recovery_key else None
-        encrypted_primary_email = encrypt(primary_email, credential_key) if primary_email else None
-        encrypted_secondary_email = encrypt(secondary_email, credential_key) if secondary_email else None
-        encrypted_token = encrypt(token, credential_key) if token else None
-        encrypted_notes = encrypt(notes, credential_key) if notes else None
+        # Encrypt all the provided credential fields with the credential key
+        encrypted_fields = Credential.encrypt_attrs(
+            credential_key,
+            username=username,
+            password=password,
+            url=url,
+            recovery_key=recovery_key,
+            primary_email=primary_email,
+            secondary_email=secondary_email,
+            token=token,
+            notes=notes
+        )
 
         encrypted_credential_key = encrypt(credential_key, vault_key)
 
         # Create the credential object
         credential = Credential(
             name=name,
-            url=encrypted_url,
-            username=encrypted_username,
-            password=encrypted_password,
             encrypted_key=encrypted_credential_key,
-            token=encrypted_token,
-            recovery_key=encrypted_recovery_key,
-            primary_email=encrypted_primary_email,
-            secondary_email=encrypted_secondary_email,
-            notes=encrypted_notes
+            **encrypted_fields
         )
 
         # Add the credential to the database